@@ -1,13 +1,28 @@
 from dataclasses import dataclass
-from typing import Protocol, Dict, Tuple, Optional, Any, Union, Callable, MutableMapping
-import uuid
-
-from cachetools import LFUCache
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Protocol, Dict, Tuple, Optional, Any, Union, Callable, Mapping
+import itertools
+import math
+import struct
 
 import numpy as np
 import pandas as pd
 
 
+# cheap, process-unique cache keys for containers whose data does not depend
+# on the query
+_key_counter = itertools.count()
+_SIZE_STRUCT = struct.Struct("<2q")
+# number of queries the view-dependent containers remember.  The caches are
+# plain OrderedDicts used as LRUs so that the hit path stays in C.
+_CACHE_SIZE = 64
+# HistContainer entries scale with the number of bins, so cap by size instead
+_HIST_CACHE_NBYTES = 8 * 1024 * 1024
+# HistContainer zoom levels per doubling of the visible range
+_HIST_ZOOM_STEPS = 64
+
+
 class _MatplotlibTransform(Protocol):
     def transform(self, verts):
         ...
@@ -38,13 +53,16 @@ class DataContainer(Protocol):
         coord_transform: _MatplotlibTransform,
         size: Tuple[int, int],
         /,
-    ) -> Tuple[Dict[str, Any], Union[str, int]]:
+    ) -> Tuple[Mapping[str, Any], Union[str, int]]:
         """
         Query the data container for data.
 
         We are given the data limits and the screen size so that we have an
         estimate of how finely (or not) we need to sample the data we wrapping.
 
+        The returned mapping (and the arrays in it) must be treated as
+        read-only, containers may hand out views of their internal state.
+
         Parameters
         ----------
         coord_transform : matplotlib.transform.Transform
@@ -57,7 +75,7 @@ class DataContainer(Protocol):
 
         Returns
         -------
-        data : Dict[str, Any]
+        data : Mapping[str, Any]
             The values are really array-likes, but 🤷 how to spell that in typing given
             that the dimension and type will depend on the key / how it is set up and the
             size may depend on the input values
@@ -67,16 +85,26 @@ class DataContainer(Protocol):
             computations on this data.
         """
 
-    def describe(self) -> Dict[str, Desc]:
+    def describe(self) -> Mapping[str, Desc]:
         """
         Describe the data a query will return
 
         Returns
         -------
-        Dict[str, Desc]
+        Mapping[str, Desc]
+            Read-only.
         """
 
 
+def _query_hash(coord_transform, size):
+    # TODO find a better way to compute the hash key, this is not sentative to
+    # scale changes, only limit changes
+    # hash the raw bytes of the bounds and size in one go rather than
+    # building (and hashing) nested tuples of Python floats
+    data_bounds = coord_transform.transform([[0, 0], [1, 1]])
+    return hash(data_bounds.tobytes() + _SIZE_STRUCT.pack(int(size[0]), int(size[1])))
+
+
 class NoNewKeys(ValueError):
     ...
 
@@ -84,18 +112,23 @@ class NoNewKeys(ValueError):
 class ArrayContainer:
     def __init__(self, **data):
         self._data = data
-        self._cache_key = str(uuid.uuid4())
+        # hand out read-only views rather than copying on every query.  The
+        # underlying dict is replaced (never mutated) on update so views that
+        # have already been handed out do not change under the caller.
+        self._data_view = MappingProxyType(self._data)
+        self._cache_key = next(_key_counter)
         self._desc = {k: Desc(v.shape, v.dtype) for k, v in data.items()}
+        self._desc_view = MappingProxyType(self._desc)
 
     def query(
         self,
         coord_transform: _MatplotlibTransform,
         size: Tuple[int, int],
-    ) -> Tuple[Dict[str, Any], Union[str, int]]:
-        return dict(self._data), self._cache_key
+    ) -> Tuple[Mapping[str, Any], Union[str, int]]:
+        return self._data_view, self._cache_key
 
-    def describe(self) -> Dict[str, Desc]:
-        return dict(self._desc)
+    def describe(self) -> Mapping[str, Desc]:
+        return self._desc_view
 
     def update(self, **data):
         # TODO check that this is still consistent with desc!
@@ -104,22 +137,38 @@ class ArrayContainer:
                 f"The keys that currently exist are {set(self._data)}.  You "
                 f"tried to add {set(data) - set(self._data)!r}."
             )
-        self._data.update(data)
-        self._cache_key = str(uuid.uuid4())
+        self._data = {**self._data, **data}
+        self._data_view = MappingProxyType(self._data)
+        self._cache_key = next(_key_counter)
 
 
 class RandomContainer:
     def __init__(self, **shapes):
         self._desc = {k: Desc(s, np.dtype(float)) for k, s in shapes.items()}
+        # the draws for each view are seeded from this and the view's key so
+        # that a view evicted from the cache comes back with the same data
+        self._seed = np.random.SeedSequence().entropy
+        self._cache: OrderedDict[Union[str, int], Dict[str, Any]] = OrderedDict()
 
     def query(
         self,
         coord_transform: _MatplotlibTransform,
         size: Tuple[int, int],
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
-        return {k: np.random.randn(*d.shape) for k, d in self._desc.items()}, str(
-            uuid.uuid4()
-        )
+        # only re-roll the data when the view changes so that repeated draws
+        # of the same view are stable and can be cached downstream
+        hash_key = _query_hash(coord_transform, size)
+        if hash_key in self._cache:
+            self._cache.move_to_end(hash_key)
+            return self._cache[hash_key], hash_key
+
+        rng = np.random.default_rng((self._seed, hash_key & 0xFFFFFFFF))
+        ret = self._cache[hash_key] = {
+            k: rng.standard_normal(d.shape) for k, d in self._desc.items()
+        }
+        if len(self._cache) > _CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return ret, hash_key
 
     def describe(self) -> Dict[str, Desc]:
         return dict(self._desc)
@@ -171,47 +220,40 @@ class FuncContainer:
         self._xfuncs = _split(xfuncs) if xfuncs is not None else {}
         self._yfuncs = _split(yfuncs) if yfuncs is not None else {}
         self._xyfuncs = _split(xyfuncs) if xyfuncs is not None else {}
-        self._cache: MutableMapping[Union[str, int], Any] = LFUCache(64)
-
-    def _query_hash(self, coord_transform, size):
-        # TODO find a better way to compute the hash key, this is not sentative to
-        # scale changes, only limit changes
-        data_bounds = tuple(coord_transform.transform([[0, 0], [1, 1]]).flatten())
-        hash_key = hash((data_bounds, size))
-        return hash_key
+        self._cache: OrderedDict[Union[str, int], Dict[str, Any]] = OrderedDict()
 
     def query(
         self,
         coord_transform: _MatplotlibTransform,
         size: Tuple[int, int],
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
-        hash_key = self._query_hash(coord_transform, size)
+        hash_key = _query_hash(coord_transform, size)
         if hash_key in self._cache:
+            self._cache.move_to_end(hash_key)
             return self._cache[hash_key], hash_key
 
         xpix, ypix = size
-        x_data, _ = coord_transform.transform(
-            np.vstack(
-                [
-                    np.linspace(0, 1, int(xpix) * 2),
-                    np.zeros(int(xpix) * 2),
-                ]
-            ).T
-        ).T
-        _, y_data = coord_transform.transform(
-            np.vstack(
-                [
-                    np.zeros(int(ypix) * 2),
-                    np.linspace(0, 1, int(ypix) * 2),
-                ]
-            ).T
-        ).T
-
-        ret = self._cache[hash_key] = dict(
-            **{k: f(x_data) for k, f in self._xfuncs.items()},
-            **{k: f(y_data) for k, f in self._yfuncs.items()},
-            **{k: f(x_data, y_data) for k, f in self._xyfuncs.items()},
-        )
+        nx = int(xpix) * 2
+        ny = int(ypix) * 2
+        # sample along the bottom and left edges of the axes in one transform
+        # call.  This is a fresh buffer each time as the functions may return
+        # views of their input which end up in the cache.
+        axes_pts = np.zeros((nx + ny, 2))
+        axes_pts[:nx, 0] = np.linspace(0, 1, nx)
+        axes_pts[nx:, 1] = np.linspace(0, 1, ny)
+        data_pts = coord_transform.transform(axes_pts)
+        x_data = data_pts[:nx, 0]
+        y_data = data_pts[nx:, 1]
+
+        ret = self._cache[hash_key] = {}
+        for k, f in self._xfuncs.items():
+            ret[k] = f(x_data)
+        for k, f in self._yfuncs.items():
+            ret[k] = f(y_data)
+        for k, f in self._xyfuncs.items():
+            ret[k] = f(x_data, y_data)
+        if len(self._cache) > _CACHE_SIZE:
+            self._cache.popitem(last=False)
         return ret, hash_key
 
     def describe(self) -> Dict[str, Desc]:
@@ -220,14 +262,52 @@ class FuncContainer:
 
 class HistContainer:
     def __init__(self, raw_data, num_bins: int):
+        """
+        A container that re-bins a 1D dataset to the visible x-range.
+
+        The visible range is split into *num_bins* bins with (up to) one extra
+        bin on either side to collect the data outside of the view.
+
+        The raw data is sorted once up front, which makes the sorted array an
+        exact cumulative count: the number of points below any edge is a
+        binary search.  Re-binning to a new view is thus O(B log N) for B
+        bins and N points, with no pass over the raw data and no
+        approximation.
+
+        Parameters
+        ----------
+        raw_data : array-like
+            The values to histogram.
+
+        num_bins : int
+            The number of bins to split the visible range into.
+        """
         self._raw_data = raw_data
         self._num_bins = num_bins
+        self._ramp = np.linspace(0, 1, num_bins)
         self._desc = {
             "edges": Desc((num_bins + 1 + 2,), np.dtype(float)),
             "density": Desc((num_bins + 2,), np.dtype(float)),
         }
-        self._full_range = (raw_data.min(), raw_data.max())
-        self._cache: MutableMapping[Union[str, int], Any] = LFUCache(64)
+        self._cache: OrderedDict[Union[str, int], Dict[str, Any]] = OrderedDict()
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Re-read *raw_data* and drop all cached histograms.
+
+        This must be called if *raw_data* is modified in place.
+        """
+        # sort once so that each re-binning is a binary search per edge
+        # rather than a full pass over the raw data
+        self._sorted = np.sort(self._raw_data, axis=None)
+        self._n = len(self._sorted)
+        self._full_range = (self._sorted[0], self._sorted[-1])
+        # folded into the cache keys so that down-stream caches are also
+        # invalidated
+        self._generation = next(_key_counter)
+        self._cache.clear()
+        self._cache_nbytes = 0
 
     def query(
         self,
@@ -238,23 +318,64 @@ class HistContainer:
         xmin, ymin, xmax, ymax = coord_transform.transform([[0, 0], [1, 1]]).flatten()
 
         xmin, xmax = np.clip([xmin, xmax], dmin, dmax)
-        hash_key = hash((xmin, xmax))
+        # quantize the limits to a fraction of a (visible) pixel so that
+        # sub-pixel jitter while panning hits the cache rather than
+        # re-binning.  The step is derived from the zoom level, itself
+        # quantized on a log scale, so that small changes to the view width
+        # do not shift the whole grid.
+        xpix = max(int(size[0]), 1)
+        span = xmax - xmin
+        if span > 0:
+            zoom = round(math.log2(span) * _HIST_ZOOM_STEPS)
+            step = 2 ** (zoom / _HIST_ZOOM_STEPS) / (4 * xpix)
+        else:
+            zoom, step = None, 1
+        hash_key = hash(
+            (
+                zoom,
+                round((xmin - dmin) / step),
+                round((xmax - dmin) / step),
+                self._num_bins,
+                xpix,
+                self._generation,
+            )
+        )
         if hash_key in self._cache:
+            self._cache.move_to_end(hash_key)
             return self._cache[hash_key], hash_key
         # TODO this gives an artifact with high lw
-        edges_in = []
-        if dmin < xmin:
-            edges_in.append(np.array([dmin]))
-        edges_in.append(np.linspace(xmin, xmax, self._num_bins))
-        if xmax < dmax:
-            edges_in.append(np.array([dmax]))
-
-        density, edges = np.histogram(
-            self._raw_data,
-            bins=np.concatenate(edges_in),
-            density=True,
-        )
+        i0 = int(dmin < xmin)
+        i1 = i0 + self._num_bins
+        # with a single bin the only in-view edge is xmin
+        last = xmax if self._num_bins > 1 else xmin
+        # the edges are handed out (and cached) so they need their own buffer,
+        # but fill it in place rather than concatenating pieces
+        edges = np.empty(i1 + int(last < dmax))
+        inner = edges[i0:i1]
+        np.multiply(self._ramp, xmax - xmin, out=inner)
+        inner += xmin
+        if self._num_bins > 1:
+            # match linspace, which pins the last point to the end exactly
+            inner[-1] = xmax
+        if i0:
+            edges[0] = dmin
+        if last < dmax:
+            edges[-1] = dmax
+
+        # match np.histogram: bins are half-open except the last which also
+        # includes its right edge.  The last edge is always dmax so it closes
+        # over all of the data.
+        idx = np.searchsorted(self._sorted, edges, side="left")
+        idx[-1] = self._n
+        density = np.empty(len(edges) - 1)
+        np.subtract(idx[1:], idx[:-1], out=density)
+        density /= np.diff(edges)
+        density /= self._n
         ret = self._cache[hash_key] = {"edges": edges, "density": density}
+        self._cache_nbytes += edges.nbytes + density.nbytes
+        while self._cache_nbytes > _HIST_CACHE_NBYTES and len(self._cache) > 1:
+            _, old = self._cache.popitem(last=False)
+            self._cache_nbytes -= old["edges"].nbytes + old["density"].nbytes
         return ret, hash_key
 
     def describe(self) -> Dict[str, Desc]:
@@ -264,7 +385,7 @@ class HistContainer:
 class SeriesContainer:
     _data: pd.DataFrame
     _index_name: str
-    _hash_key: str
+    _hash_key: int
 
     def __init__(self, series: pd.Series, *, index_name: str, col_name: str):
         # TODO make a copy?
@@ -275,7 +396,10 @@ class SeriesContainer:
             index_name: Desc((len(series),), series.index.dtype),
             col_name: Desc((len(series),), series.dtype),
         }
-        self._hash_key = str(uuid.uuid4())
+        # do the pandas attribute lookups once rather than on every query
+        self._index_values = series.index.values
+        self._col_values = series.values
+        self._hash_key = next(_key_counter)
 
     def query(
         self,
@@ -283,8 +407,8 @@ class SeriesContainer:
         size: Tuple[int, int],
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
         return {
-            self._index_name: self._data.index.values,
-            self._col_name: self._data.values,
+            self._index_name: self._index_values,
+            self._col_name: self._col_values,
         }, self._hash_key
 
     def describe(self) -> Dict[str, Desc]:
@@ -317,20 +441,21 @@ class DataFrameContainer:
         for col, out in self._col_name_dict.items():
             self._desc[out] = Desc((len(df),), df[col].dtype)
 
-        self._hash_key = str(uuid.uuid4())
+        # do the pandas label lookups once rather than on every query
+        self._arrays: Dict[str, Any] = {}
+        if self._index_name is not None:
+            self._arrays[self._index_name] = df.index.values
+        for col, out in self._col_name_dict.items():
+            self._arrays[out] = df[col].values
+
+        self._hash_key = next(_key_counter)
 
     def query(
         self,
         coord_transform: _MatplotlibTransform,
         size: Tuple[int, int],
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
-        ret = {}
-        if self._index_name is not None:
-            ret[self._index_name] = self._data.index.values
-        for col, out in self._col_name_dict.items():
-            ret[out] = self._data[col].values
-
-        return ret, self._hash_key
+        return dict(self._arrays), self._hash_key
 
     def describe(self) -> Dict[str, Desc]:
         return dict(self._desc)
@@ -366,7 +491,7 @@ class DataUnion:
         size: Tuple[int, int],
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
         cache_keys = []
-        ret = {}
+        ret: Dict[str, Any] = {}
         for data in self._datas:
             base, cache_key = data.query(coord_transform, size)
             ret.update(base)
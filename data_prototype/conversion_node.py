@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Callable, Sequence
+from collections.abc import Iterable, Callable, Mapping, Sequence
 from collections import Counter
 from dataclasses import dataclass
 import inspect
@@ -9,7 +9,7 @@ from functools import cached_property
 from typing import Any
 
 
-def evaluate_pipeline(nodes: Sequence[ConversionNode], input: dict[str, Any]):
+def evaluate_pipeline(nodes: Sequence[ConversionNode], input: Mapping[str, Any]):
     for node in nodes:
         input = node.evaluate(input)
     return input
@@ -28,7 +28,7 @@ class ConversionNode:
             return tuple(sorted(set(self.output_keys)))
         return tuple(sorted(set(input_keys) | set(self.output_keys)))
 
-    def evaluate(self, input: dict[str, Any]) -> dict[str, Any]:
+    def evaluate(self, input: Mapping[str, Any]) -> Mapping[str, Any]:
         if self.trim_keys:
             return {k: input[k] for k in self.output_keys}
         else:
@@ -49,7 +49,7 @@ class UnionConversionNode(ConversionNode):
             raise ValueError(f"Duplicate keys from multiple input nodes: {duplicate}")
         return cls(required, tuple(output), trim_keys, nodes)
 
-    def evaluate(self, input: dict[str, Any]) -> dict[str, Any]:
+    def evaluate(self, input: Mapping[str, Any]) -> Mapping[str, Any]:
         return super().evaluate(
             {k: v for n in self.nodes for k, v in n.evaluate(input).items()}
         )
@@ -67,7 +67,7 @@ class RenameConversionNode(ConversionNode):
             raise ValueError(f"Duplicate output keys in mapping: {duplicate}")
         return cls(required, tuple(output), trim_keys, mapping)
 
-    def evaluate(self, input: dict[str, Any]) -> dict[str, Any]:
+    def evaluate(self, input: Mapping[str, Any]) -> Mapping[str, Any]:
         return super().evaluate(
             {**input, **{out: input[inp] for (inp, out) in self.mapping.items()}}
         )
@@ -91,7 +91,7 @@ class FunctionConversionNode(ConversionNode):
         input = tuple(set(input))
         return cls(input, output, trim_keys, funcs)
 
-    def evaluate(self, input: dict[str, Any]) -> dict[str, Any]:
+    def evaluate(self, input: Mapping[str, Any]) -> Mapping[str, Any]:
         return super().evaluate(
             {
                 **input,
@@ -111,5 +111,5 @@ class LimitKeysConversionNode(ConversionNode):
     def from_keys(cls, keys: Sequence[str]):
         return cls((), tuple(keys), trim_keys=True, keys=set(keys))
 
-    def evaluate(self, input: dict[str, Any]) -> dict[str, Any]:
+    def evaluate(self, input: Mapping[str, Any]) -> Mapping[str, Any]:
         return {k: v for k, v in input.items() if k in self.keys}
@@ -1,6 +1,7 @@
 import numpy as np
+import pandas as pd
 
-from matplotlib.transforms import IdentityTransform
+from matplotlib.transforms import Affine2D, IdentityTransform
 
 import pytest
 
@@ -57,6 +58,12 @@ def test_array_cache_update(ac):
         assert np.all(2 * data[k] == data2[k])
 
 
+def test_array_query_read_only(ac):
+    data, _ = ac.query(IdentityTransform(), [100, 100])
+    with pytest.raises(TypeError):
+        data["a"] = np.arange(3)
+
+
 def test_array_no_new_keys(ac):
     with pytest.raises(containers.NoNewKeys):
         ac.update(d=[1, 2])
@@ -71,7 +78,205 @@ def test_random_describe(rc):
     _verify_describe(rc)
 
 
-def test_random_ustable_cache(rc):
+def test_random_cache_stable(rc):
+    data, cache_key = rc.query(IdentityTransform(), [100, 100])
+    data2, cache_key2 = rc.query(IdentityTransform(), [100, 100])
+    assert cache_key == cache_key2
+    for k in set(data) | set(data2):
+        assert np.all(data[k] == data2[k])
+
+
+def test_random_cache_evicted(rc):
+    data, cache_key = rc.query(IdentityTransform(), [100, 100])
+    for j in range(containers._CACHE_SIZE + 5):
+        rc.query(IdentityTransform(), [j + 1, 1])
+    data2, cache_key2 = rc.query(IdentityTransform(), [100, 100])
+
+    assert data is not data2
+    assert cache_key == cache_key2
+    for k in set(data) | set(data2):
+        assert np.all(data[k] == data2[k])
+
+
+def test_random_float_size(rc):
+    data, cache_key = rc.query(IdentityTransform(), (100.0, np.float64(100)))
+    data2, cache_key_2 = rc.query(IdentityTransform(), (100, 100))
+    assert cache_key == cache_key_2
+    assert data is data2
+
+
+def test_random_cache_new_view(rc):
     _, cache_key = rc.query(IdentityTransform(), [100, 100])
-    _, cache_key2 = rc.query(IdentityTransform(), [100, 100])
-    assert cache_key != cache_key2
+    _, cache_key2 = rc.query(IdentityTransform(), [10, 10])
+    _, cache_key3 = rc.query(Affine2D().scale(2), [100, 100])
+    assert len({cache_key, cache_key2, cache_key3}) == 3
+
+
+@pytest.fixture
+def hc():
+    return containers.HistContainer(np.linspace(0, 1, 1000), 10)
+
+
+def test_hist_cache_subpixel(hc):
+    data, cache_key = hc.query(IdentityTransform(), [100, 100])
+    data2, cache_key_2 = hc.query(Affine2D().translate(1e-5, 0), [100, 100])
+    assert cache_key == cache_key_2
+    assert data is data2
+
+    _, cache_key_3 = hc.query(IdentityTransform(), [200, 100])
+    assert cache_key != cache_key_3
+
+
+@pytest.mark.parametrize("num_bins", [1, 10])
+@pytest.mark.parametrize("xlim", [(-1, 1), (-5, -0.5), (0.5, 5), (-5, 5)])
+def test_hist_matches_numpy(num_bins, xlim):
+    raw = np.random.default_rng(0).standard_normal(1000)
+    hc = containers.HistContainer(raw, num_bins)
+    xmin, xmax = xlim
+    data, _ = hc.query(Affine2D().scale(xmax - xmin, 1).translate(xmin, 0), [100, 100])
+    assert data["edges"][0] == raw.min()
+    assert data["edges"][-1] == raw.max()
+    density, _ = np.histogram(raw, bins=data["edges"], density=True)
+    np.testing.assert_allclose(data["density"], density)
+
+
+def test_hist_invalidate():
+    raw = np.linspace(0, 1, 1000)
+    hc = containers.HistContainer(raw, 10)
+    data, cache_key = hc.query(IdentityTransform(), [100, 100])
+    raw[:500] = 1
+    hc.invalidate()
+    data2, cache_key_2 = hc.query(IdentityTransform(), [100, 100])
+
+    assert cache_key != cache_key_2
+    assert not np.all(data["density"] == data2["density"])
+
+
+def test_hist_cache_nbytes(monkeypatch, hc):
+    monkeypatch.setattr(containers, "_HIST_CACHE_NBYTES", 1024)
+    for j in range(20):
+        hc.query(IdentityTransform(), [j + 1, 100])
+    assert 0 < hc._cache_nbytes <= 1024
+    assert hc._cache_nbytes == sum(
+        v["edges"].nbytes + v["density"].nbytes for v in hc._cache.values()
+    )
+
+
+def test_hist_cache_zoomed():
+    raw = np.random.default_rng(0).uniform(0, 1000, 100_000)
+    hc = containers.HistContainer(raw, 25)
+
+    def view(xmin, xmax):
+        return Affine2D().scale(xmax - xmin, 1).translate(xmin, 0)
+
+    data, cache_key = hc.query(view(500.0, 500.1), [800, 600])
+    np.testing.assert_allclose(data["edges"][[1, -2]], [500.0, 500.1])
+
+    # sub-pixel jitter at this zoom level still hits the cache
+    _, cache_key_2 = hc.query(view(500.0 - 1e-6, 500.1 - 1e-6), [800, 600])
+    assert cache_key == cache_key_2
+
+    # zooming in further or panning does not
+    data3, cache_key_3 = hc.query(view(500.02, 500.08), [800, 600])
+    assert cache_key_3 != cache_key
+    np.testing.assert_allclose(data3["edges"][[1, -2]], [500.02, 500.08])
+
+    data4, cache_key_4 = hc.query(view(500.03, 500.13), [800, 600])
+    assert cache_key_4 != cache_key
+    np.testing.assert_allclose(data4["edges"][[1, -2]], [500.03, 500.13])
+
+
+@pytest.fixture
+def fc():
+    return containers.FuncContainer(
+        {"x": (("N",), lambda x: x), "y": (("N",), np.sin)},
+    )
+
+
+def test_func_cache(fc):
+    data, cache_key = fc.query(IdentityTransform(), [100, 100])
+    data2, cache_key_2 = fc.query(IdentityTransform(), [100, 100])
+    assert cache_key == cache_key_2
+    assert data is data2
+
+    _, cache_key_3 = fc.query(IdentityTransform(), [50, 100])
+    _, cache_key_4 = fc.query(Affine2D().scale(1 + 1e-12), [100, 100])
+    assert len({cache_key, cache_key_3, cache_key_4}) == 3
+
+
+def test_func_float_size(fc):
+    data, cache_key = fc.query(IdentityTransform(), (100.0, np.float64(100)))
+    data2, cache_key_2 = fc.query(IdentityTransform(), (100, 100))
+    assert cache_key == cache_key_2
+    assert data is data2
+
+
+def test_func_cache_lru(fc):
+    first, _ = fc.query(IdentityTransform(), [1, 1])
+    second, _ = fc.query(IdentityTransform(), [2, 2])
+    for j in range(containers._CACHE_SIZE - 1):
+        fc.query(IdentityTransform(), [1, 1])
+        fc.query(IdentityTransform(), [j + 3, 1])
+
+    assert fc.query(IdentityTransform(), [1, 1])[0] is first
+    assert fc.query(IdentityTransform(), [2, 2])[0] is not second
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame(
+        {"a": np.arange(5), "b": np.linspace(0, 1, 5)}, index=np.arange(5) * 2
+    )
+
+
+@pytest.fixture
+def dfc(df):
+    return containers.DataFrameContainer(
+        df, col_names=lambda n: f"{n}_out", index_name="idx"
+    )
+
+
+def test_dataframe_describe(dfc):
+    _verify_describe(dfc)
+
+
+def test_dataframe_query(df, dfc):
+    data, cache_key = dfc.query(IdentityTransform(), [100, 100])
+    assert set(data) == {"idx", "a_out", "b_out"}
+    np.testing.assert_array_equal(data["idx"], df.index.values)
+    np.testing.assert_array_equal(data["a_out"], df["a"].values)
+    np.testing.assert_array_equal(data["b_out"], df["b"].values)
+
+    # each query gets its own dict
+    data["a_out"] = None
+    data2, cache_key_2 = dfc.query(IdentityTransform(), [100, 100])
+    assert data2 is not data
+    assert cache_key == cache_key_2
+    np.testing.assert_array_equal(data2["a_out"], df["a"].values)
+
+
+@pytest.fixture
+def series():
+    th = np.linspace(0, 1, 5)
+    return pd.Series(index=th, data=np.cos(th))
+
+
+@pytest.fixture
+def sc(series):
+    return containers.SeriesContainer(series, index_name="x", col_name="y")
+
+
+def test_series_describe(sc):
+    _verify_describe(sc)
+
+
+def test_series_query(series, sc):
+    data, cache_key = sc.query(IdentityTransform(), [100, 100])
+    assert set(data) == {"x", "y"}
+    np.testing.assert_array_equal(data["x"], series.index.values)
+    np.testing.assert_array_equal(data["y"], series.values)
+
+    data2, cache_key_2 = sc.query(IdentityTransform(), [100, 100])
+    assert cache_key == cache_key_2
+    assert data2["x"] is data["x"]
+    assert data2["y"] is data["y"]
@@ -4,7 +4,7 @@ import inspect
 import numpy as np
 
 from cachetools import LFUCache
-from functools import partial, wraps
+from functools import lru_cache, partial, wraps
 
 import matplotlib as mpl
 from matplotlib.lines import Line2D as _Line2D
@@ -69,6 +69,12 @@ def _make_identity(k):
     return identity
 
 
+@lru_cache(maxsize=None)
+def _setter_names(cls) -> Tuple[str, ...]:
+    # scanning dir() of an Artist class is slow and the answer never changes
+    return tuple(f[4:] for f in dir(cls) if f.startswith("set_"))
+
+
 def _forwarder(forwards, cls=None):
     if cls is None:
         return partial(_forwarder, forwards)
@@ -171,7 +177,7 @@ class ProxyWrapperBase:
         self._converters: list[ConversionNode] = converters or []
         setters = list(self.expected_keys | self.required_keys)
         if hasattr(self, "_wrapped_class"):
-            setters += [f[4:] for f in dir(self._wrapped_class) if f.startswith("set_")]
+            setters += _setter_names(self._wrapped_class)
         self._converters.append(LimitKeysConversionNode.from_keys(setters))
         self.stale = True
 
@@ -217,17 +223,18 @@ class LineWrapper(ProxyWrapper):
         "get_data",
     )
     required_keys = {"x", "y"}
+    # this does not depend on the instance so build it once and share it
+    _rename_xy = RenameConversionNode.from_mapping({"x": "xdata", "y": "ydata"})
 
     def __init__(self, data: DataContainer, converters=None, /, **kwargs):
         super().__init__(data, converters)
         self._wrapped_instance = self._wrapped_class(
             np.array([]), np.array([]), **kwargs
         )
-        self._converters.insert(
-            -1, RenameConversionNode.from_mapping({"x": "xdata", "y": "ydata"})
+        self._converters.insert(-1, self._rename_xy)
+        self._converters[-1] = LimitKeysConversionNode.from_keys(
+            _setter_names(self._wrapped_class)
         )
-        setters = [f[4:] for f in dir(self._wrapped_class) if f.startswith("set_")]
-        self._converters[-1] = LimitKeysConversionNode.from_keys(setters)
 
     @_stale_wrapper
     def draw(self, renderer):
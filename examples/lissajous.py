@@ -27,6 +27,9 @@ class Lissajous:
     N = 1024
     # cycles per minutes
     scale = 2
+    # the marker is the same every frame so only build it once
+    marker_obj = mmarkers.MarkerStyle("o")
+    marker_path = marker_obj.get_path().transformed(marker_obj.get_transform())
 
     def describe(self):
         return {
@@ -51,14 +54,11 @@ class Lissajous:
             )
 
             phase = 15 * np.pi * (self.scale * cur_time % 60) / 150
-            marker_obj = mmarkers.MarkerStyle("o")
             return {
                 "x": np.cos(5 * phase),
                 "y": np.sin(3 * phase),
                 "sizes": np.array([256]),
-                "paths": [
-                    marker_obj.get_path().transformed(marker_obj.get_transform())
-                ],
+                "paths": [self.marker_path],
                 "edgecolors": "k",
                 "facecolors": ["#4682b4ff", "#82b446aa", "#46b48288", "#8246b433"],
                 "time": cur_time[0],